@@ -2,12 +2,14 @@ import json
 import pathlib
 import re
 import shutil
-import tempfile
 import textwrap
-from contextlib import contextmanager
+from collections.abc import Sequence
 from pathlib import Path
+from typing import Any, Callable, Optional
 
-from click.testing import CliRunner
+import click
+import pytest
+from click.testing import CliRunner, Result
 
 from langgraph_cli.cli import cli, prepare_args_and_stdin
 from langgraph_cli.config import Config, _get_pip_cleanup_lines, validate_config
@@ -24,59 +26,27 @@ DEFAULT_DOCKER_CAPABILITIES = DockerCapabilities(
     version_compose=Version(2, 27, 0),
     healthcheck_start_interval=True,
 )
-
-
-@contextmanager
-def temporary_config_folder(config_content: dict, levels: int = 0):
-    # Create a temporary directory
-    temp_dir = tempfile.mkdtemp()
-    try:
-        # Define the path for the config.json file
-        config_path = Path(temp_dir) / f"{'a/' * levels}config.json"
-        # Ensure the parent directory exists
-        config_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # Write the provided dictionary content to config.json
-        with open(config_path, "w", encoding="utf-8") as config_file:
-            json.dump(config_content, config_file)
-
-        # Yield the temporary directory path for use within the context
-        yield config_path.parent
-    finally:
-        # Cleanup the temporary directory and its contents
-        shutil.rmtree(temp_dir)
-
-
-def test_prepare_args_and_stdin() -> None:
-    # this basically serves as an end-to-end test for using config and docker helpers
-    config_path = pathlib.Path(__file__).parent / "langgraph.json"
-    config = validate_config(
-        Config(dependencies=[".", "../../.."], graphs={"agent": "agent.py:graph"})
-    )
-    port = 8000
-    debugger_port = 8001
-    debugger_graph_url = f"http://127.0.0.1:{port}"
-
-    actual_args, actual_stdin = prepare_args_and_stdin(
-        capabilities=DEFAULT_DOCKER_CAPABILITIES,
-        config_path=config_path,
-        config=config,
-        docker_compose=pathlib.Path("custom-docker-compose.yml"),
-        port=port,
-        debugger_port=debugger_port,
-        debugger_base_url=debugger_graph_url,
-        watch=True,
-    )
-
-    expected_args = [
-        "--project-directory",
-        str(pathlib.Path(__file__).parent.absolute()),
-        "-f",
-        "custom-docker-compose.yml",
-        "-f",
-        "-",
-    ]
-    expected_stdin = f"""volumes:
+_FROM_BASE_IMAGE_RE = re.compile(r"FROM langchain/langgraph-server:0\.2-py3.*")
+
+# Expected output of `prepare_args_and_stdin` for the end-to-end tests below.
+# Everything that goes into it is fixed, so build the strings once at import.
+_THIS_DIR = pathlib.Path(__file__).parent.absolute()
+_REPO_ROOT = _THIS_DIR.parent.parent.parent.absolute()
+_INDENTED_CLEANUP_LINES = textwrap.indent(
+    textwrap.dedent(FORMATTED_CLEANUP_LINES), " " * 16
+)
+_PORT = 8000
+_DEBUGGER_PORT = 8001
+_DEBUGGER_GRAPH_URL = f"http://127.0.0.1:{_PORT}"
+_EXPECTED_ARGS = [
+    "--project-directory",
+    str(_THIS_DIR),
+    "-f",
+    "custom-docker-compose.yml",
+    "-f",
+    "-",
+]
+_EXPECTED_STDIN_NO_IMAGE = f"""volumes:
     langgraph-data:
         driver: local
 services:
@@ -115,9 +85,9 @@ services:
             langgraph-postgres:
                 condition: service_healthy
         ports:
-            - "{debugger_port}:3968"
+            - "{_DEBUGGER_PORT}:3968"
         environment:
-            VITE_STUDIO_LOCAL_GRAPH_URL: {debugger_graph_url}
+            VITE_STUDIO_LOCAL_GRAPH_URL: {_DEBUGGER_GRAPH_URL}
     langgraph-api:
         ports:
             - "8000:8000"
@@ -139,7 +109,7 @@ services:
         build:
             context: .
             additional_contexts:
-                - cli_1: {str(pathlib.Path(__file__).parent.parent.parent.parent.absolute())}
+                - cli_1: {_REPO_ROOT}
             dockerfile_inline: |
                 FROM langchain/langgraph-api:3.11
                 # -- Adding local package . --
@@ -152,7 +122,7 @@ services:
                 RUN PYTHONDONTWRITEBYTECODE=1 uv pip install --system --no-cache-dir -c /api/constraints.txt -e /deps/*
                 # -- End of local dependencies install --
                 ENV LANGSERVE_GRAPHS='{{"agent": "agent.py:graph"}}'
-{textwrap.indent(textwrap.dedent(FORMATTED_CLEANUP_LINES), "                ")}
+{_INDENTED_CLEANUP_LINES}
                 WORKDIR /deps/cli
         
         develop:
@@ -164,41 +134,8 @@ services:
                 - path: ../../..
                   action: rebuild\
 """
-    assert actual_args == expected_args
-    assert clean_empty_lines(actual_stdin) == expected_stdin
-
-
-def test_prepare_args_and_stdin_with_image() -> None:
-    # this basically serves as an end-to-end test for using config and docker helpers
-    config_path = pathlib.Path(__file__).parent / "langgraph.json"
-    config = validate_config(
-        Config(dependencies=[".", "../../.."], graphs={"agent": "agent.py:graph"})
-    )
-    port = 8000
-    debugger_port = 8001
-    debugger_graph_url = f"http://127.0.0.1:{port}"
 
-    actual_args, actual_stdin = prepare_args_and_stdin(
-        capabilities=DEFAULT_DOCKER_CAPABILITIES,
-        config_path=config_path,
-        config=config,
-        docker_compose=pathlib.Path("custom-docker-compose.yml"),
-        port=port,
-        debugger_port=debugger_port,
-        debugger_base_url=debugger_graph_url,
-        watch=True,
-        image="my-cool-image",
-    )
-
-    expected_args = [
-        "--project-directory",
-        str(pathlib.Path(__file__).parent.absolute()),
-        "-f",
-        "custom-docker-compose.yml",
-        "-f",
-        "-",
-    ]
-    expected_stdin = f"""volumes:
+_EXPECTED_STDIN_WITH_IMAGE = f"""volumes:
     langgraph-data:
         driver: local
 services:
@@ -237,9 +174,9 @@ services:
             langgraph-postgres:
                 condition: service_healthy
         ports:
-            - "{debugger_port}:3968"
+            - "{_DEBUGGER_PORT}:3968"
         environment:
-            VITE_STUDIO_LOCAL_GRAPH_URL: {debugger_graph_url}
+            VITE_STUDIO_LOCAL_GRAPH_URL: {_DEBUGGER_GRAPH_URL}
     langgraph-api:
         ports:
             - "8000:8000"
@@ -268,498 +205,493 @@ services:
                 - path: ../../..
                   action: rebuild\
 """
-    assert actual_args == expected_args
-    assert clean_empty_lines(actual_stdin) == expected_stdin
 
 
-def test_version_option() -> None:
-    """Test the --version option of the CLI."""
-    runner = CliRunner()
-    result = runner.invoke(cli, ["--version"])
+def _write_config(
+    root: Path, config_content: dict, levels: int = 0, files: Sequence[str] = ()
+) -> Path:
+    """Write config.json (and empty `files`) under `root`, return its directory."""
+    # Define the path for the config.json file
+    config_path = root.joinpath(*(["a"] * levels), "config.json")
+    # Ensure the parent directory exists
+    config_path.parent.mkdir(parents=True, exist_ok=True)
 
-    # Verify that the command executed successfully
-    assert result.exit_code == 0, "Expected exit code 0 for --version option"
+    # Write the provided dictionary content to config.json
+    config_path.write_text(json.dumps(config_content), encoding="utf-8")
 
-    # Check that the output contains the correct version information
-    assert "LangGraph CLI, version" in result.output, (
-        "Expected version information in output"
-    )
+    # Create any (empty) files referenced by the config, e.g. agent.py
+    for file in files:
+        file_path = config_path.parent / file
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.touch()
 
+    return config_path.parent
 
-def test_dockerfile_command_basic() -> None:
-    """Test the 'dockerfile' command with basic configuration."""
-    runner = CliRunner()
-    config_content = {
-        "python_version": "3.11",
-        "graphs": {"agent": "agent.py:graph"},
-        "dependencies": ["."],
-    }
 
-    with temporary_config_folder(config_content) as temp_dir:
-        save_path = temp_dir / "Dockerfile"
+@pytest.fixture(scope="module")
+def runner() -> CliRunner:
+    # CliRunner keeps no state between invocations, so one is enough per module
+    return CliRunner()
 
-        result = runner.invoke(
-            cli,
-            ["dockerfile", str(save_path), "--config", str(temp_dir / "config.json")],
-        )
 
-        # Assert command was successful
-        assert result.exit_code == 0, result.output
-        assert "✅ Created: Dockerfile" in result.output
+# Config folders shared by every test in this module. Tests only write (and
+# remove) generated artifacts such as the Dockerfile, so the config itself is
+# created once per module instead of once per test.
+#
+# Tests only write under tmp_path/tmp_path_factory, and each pytest-xdist worker
+# builds its own copy of these fixtures, so this file is safe to run with
+# `pytest -n auto`.
 
-        # Check if Dockerfile was created
-        assert save_path.exists()
 
+@pytest.fixture(scope="module")
+def basic_config_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return _write_config(
+        tmp_path_factory.mktemp("basic"),
+        {
+            "python_version": "3.11",
+            "graphs": {"agent": "agent.py:graph"},
+            "dependencies": ["."],
+            # No image_distro specified - should default to debian and show warning
+        },
+        files=["agent.py"],
+    )
 
-def test_dockerfile_command_new_style_config() -> None:
-    """Test `dockerfile` command with a new style config.
 
-    This config format allows specifying agent data as a dictionary.
-    {
-        "graphs": {
-            "agent1": {
-                "path": ... # path to graph definition,
-                ... # other fields
-            }
-        }
-    }
-    """
-    runner = CliRunner()
-    config_content = {
-        "dependencies": ["./my_agent"],
-        "graphs": {
-            "agent": {
-                "path": "./my_agent/agent.py:graph",
-                "description": "This is a test agent",
-            }
+@pytest.fixture(scope="module")
+def new_style_config_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return _write_config(
+        tmp_path_factory.mktemp("new_style"),
+        {
+            "dependencies": ["./my_agent"],
+            "graphs": {
+                "agent": {
+                    "path": "./my_agent/agent.py:graph",
+                    "description": "This is a test agent",
+                }
+            },
+            "env": ".env",
         },
-        "env": ".env",
-    }
-    with temporary_config_folder(config_content) as temp_dir:
-        save_path = temp_dir / "Dockerfile"
-        # Add agent.py file
-        agent_path = temp_dir / "my_agent" / "agent.py"
-        agent_path.parent.mkdir(parents=True, exist_ok=True)
-        agent_path.touch()
+        files=["my_agent/agent.py"],
+    )
 
-        result = runner.invoke(
-            cli,
-            ["dockerfile", str(save_path), "--config", str(temp_dir / "config.json")],
-        )
 
-        # Assert command was successful
-        assert result.exit_code == 0, result.output
-        assert "✅ Created: Dockerfile" in result.output
-
-        # Check if Dockerfile was created
-        assert save_path.exists()
-
-
-def test_dockerfile_command_with_base_image() -> None:
-    """Test the 'dockerfile' command with a base image."""
-    runner = CliRunner()
-    config_content = {
-        "python_version": "3.11",
-        "graphs": {"agent": "agent.py:graph"},
-        "dependencies": ["."],
-        "base_image": "langchain/langgraph-server:0.2",
-    }
-    with temporary_config_folder(config_content) as temp_dir:
-        save_path = temp_dir / "Dockerfile"
-        agent_path = temp_dir / "agent.py"
-        agent_path.parent.mkdir(parents=True, exist_ok=True)
-        agent_path.touch()
+@pytest.fixture(scope="module")
+def base_image_config_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return _write_config(
+        tmp_path_factory.mktemp("base_image"),
+        {
+            "python_version": "3.11",
+            "graphs": {"agent": "agent.py:graph"},
+            "dependencies": ["."],
+            "base_image": "langchain/langgraph-server:0.2",
+        },
+        files=["agent.py"],
+    )
 
-        result = runner.invoke(
-            cli,
-            ["dockerfile", str(save_path), "--config", str(temp_dir / "config.json")],
-        )
 
-        assert result.exit_code == 0, result.output
-        assert "✅ Created: Dockerfile" in result.output
-
-        assert save_path.exists()
-        with open(save_path) as f:
-            dockerfile = f.read()
-            assert re.match("FROM langchain/langgraph-server:0.2-py3.*", dockerfile)
-
-
-def test_dockerfile_command_with_docker_compose() -> None:
-    """Test the 'dockerfile' command with Docker Compose configuration."""
-    runner = CliRunner()
-    config_content = {
-        "dependencies": ["./my_agent"],
-        "graphs": {"agent": "./my_agent/agent.py:graph"},
-        "env": ".env",
-    }
-    with temporary_config_folder(config_content) as temp_dir:
-        save_path = temp_dir / "Dockerfile"
-        # Add agent.py file
-        agent_path = temp_dir / "my_agent" / "agent.py"
-        agent_path.parent.mkdir(parents=True, exist_ok=True)
-        agent_path.touch()
+@pytest.fixture(scope="module")
+def wolfi_config_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return _write_config(
+        tmp_path_factory.mktemp("wolfi"),
+        {
+            "python_version": "3.11",
+            "graphs": {"agent": "agent.py:graph"},
+            "dependencies": ["."],
+            "image_distro": "wolfi",  # Explicitly set to wolfi - no warning
+        },
+        files=["agent.py"],
+    )
 
-        result = runner.invoke(
-            cli,
-            [
-                "dockerfile",
-                str(save_path),
-                "--config",
-                str(temp_dir / "config.json"),
-                "--add-docker-compose",
-            ],
-        )
 
-        # Assert command was successful
-        assert result.exit_code == 0
-        assert "✅ Created: Dockerfile" in result.output
-        assert "✅ Created: .dockerignore" in result.output
-        assert "✅ Created: docker-compose.yml" in result.output
-        assert (
-            "✅ Created: .env" in result.output or "➖ Skipped: .env" in result.output
-        )
-        assert "🎉 Files generated successfully" in result.output
+@pytest.fixture(scope="module")
+def wolfi_py312_config_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return _write_config(
+        tmp_path_factory.mktemp("wolfi_py312"),
+        {
+            "python_version": "3.12",
+            "graphs": {"agent": "agent.py:graph"},
+            "dependencies": ["."],
+            "image_distro": "wolfi",  # Use wolfi to avoid warning messages
+        },
+        files=["agent.py"],
+    )
 
-        # Check if Dockerfile, .dockerignore, docker-compose.yml, and .env were created
-        assert save_path.exists()
-        assert (temp_dir / ".dockerignore").exists()
-        assert (temp_dir / "docker-compose.yml").exists()
-        assert (temp_dir / ".env").exists() or "➖ Skipped: .env" in result.output
 
+@pytest.fixture(scope="module")
+def nodejs_config_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return _write_config(
+        tmp_path_factory.mktemp("nodejs"),
+        {
+            "node_version": "20",
+            "graphs": {"agent": "agent.js:graph"},
+        },
+        files=["agent.js"],
+    )
 
-def test_dockerfile_command_with_bad_config() -> None:
-    """Test the 'dockerfile' command with basic configuration."""
-    runner = CliRunner()
-    config_content = {
-        "node_version": "20"  # Add any other necessary configuration fields
-    }
 
-    with temporary_config_folder(config_content) as temp_dir:
-        save_path = temp_dir / "Dockerfile"
+@pytest.fixture(scope="module")
+def nested_config_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    # config.json lives three levels down so the parent dependencies resolve
+    return _write_config(
+        tmp_path_factory.mktemp("nested"),
+        {
+            "python_version": "3.11",
+            "graphs": {"agent": "agent.py:graph"},
+            "dependencies": [".", "../../..", "../.."],
+            "image_distro": "wolfi",
+        },
+        levels=3,
+        files=["agent.py"],
+    )
+
 
-        result = runner.invoke(
-            cli,
-            ["dockerfile", str(save_path), "--config", str(temp_dir / "conf.json")],
-        )
+@pytest.fixture(scope="module")
+def bad_config_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return _write_config(
+        tmp_path_factory.mktemp("bad"),
+        {
+            "node_version": "20"  # Add any other necessary configuration fields
+        },
+    )
 
-        # Assert command was successful
-        assert result.exit_code == 2
-        assert "conf.json' does not exist" in result.output
 
+@pytest.fixture
+def docker_compose_config_dir(tmp_path: Path) -> Path:
+    # Not shared: `--add-docker-compose` writes .env and friends next to the config
+    return _write_config(
+        tmp_path,
+        {
+            "dependencies": ["./my_agent"],
+            "graphs": {"agent": "./my_agent/agent.py:graph"},
+            "env": ".env",
+        },
+        files=["my_agent/agent.py"],
+    )
 
-def test_dockerfile_command_shows_wolfi_warning() -> None:
-    """Test the 'dockerfile' command shows warning when image_distro is not wolfi."""
-    runner = CliRunner()
-    config_content = {
-        "python_version": "3.11",
-        "graphs": {"agent": "agent.py:graph"},
-        "dependencies": ["."],
-        # No image_distro specified - should default to debian and show warning
-    }
 
-    with temporary_config_folder(config_content) as temp_dir:
-        save_path = temp_dir / "Dockerfile"
-        agent_path = temp_dir / "agent.py"
-        agent_path.touch()
+@pytest.fixture
+def mock_docker(
+    monkeypatch: pytest.MonkeyPatch,
+) -> list[tuple[str, tuple[str, ...], Optional[str]]]:
+    """Stub out docker so CLI commands never spawn a subprocess.
+
+    Returns the list of (cmd, args, stdin) the CLI would have executed.
+    """
+    calls: list[tuple[str, tuple[str, ...], Optional[str]]] = []
+
+    async def subp_exec(
+        cmd: str, *args: str, input: Optional[str] = None, **kwargs: Any
+    ) -> tuple[Optional[str], Optional[str]]:
+        calls.append((cmd, args, input))
+        return None, None
+
+    monkeypatch.setattr(shutil, "which", lambda cmd: f"/usr/bin/{cmd}")
+    monkeypatch.setattr("langgraph_cli.cli.subp_exec", subp_exec)
+    monkeypatch.setattr(
+        "langgraph_cli.docker.check_capabilities",
+        lambda runner: DEFAULT_DOCKER_CAPABILITIES,
+    )
+    return calls
 
-        result = runner.invoke(
-            cli,
-            ["dockerfile", str(save_path), "--config", str(temp_dir / "config.json")],
-        )
 
-        # Assert command was successful
-        assert result.exit_code == 0, result.output
+@pytest.fixture
+def validated_config() -> Config:
+    # Function-scoped: config_to_docker rewrites graph paths in place
+    return validate_config(
+        Config(dependencies=[".", "../../.."], graphs={"agent": "agent.py:graph"})
+    )
 
-        # Check that warning is shown
-        assert "Security Recommendation" in result.output
-        assert "Wolfi Linux" in result.output
-        assert "image_distro" in result.output
-        assert "wolfi" in result.output
 
+def test_prepare_args_and_stdin(validated_config: Config) -> None:
+    # this basically serves as an end-to-end test for using config and docker helpers
+    config_path = _THIS_DIR / "langgraph.json"
+
+    actual_args, actual_stdin = prepare_args_and_stdin(
+        capabilities=DEFAULT_DOCKER_CAPABILITIES,
+        config_path=config_path,
+        config=validated_config,
+        docker_compose=pathlib.Path("custom-docker-compose.yml"),
+        port=_PORT,
+        debugger_port=_DEBUGGER_PORT,
+        debugger_base_url=_DEBUGGER_GRAPH_URL,
+        watch=True,
+    )
 
-def test_dockerfile_command_no_wolfi_warning_when_wolfi_set() -> None:
-    """Test the 'dockerfile' command does NOT show warning when image_distro is wolfi."""
-    runner = CliRunner()
-    config_content = {
-        "python_version": "3.11",
-        "graphs": {"agent": "agent.py:graph"},
-        "dependencies": ["."],
-        "image_distro": "wolfi",  # Explicitly set to wolfi - should not show warning
-    }
+    assert actual_args == _EXPECTED_ARGS
+    assert clean_empty_lines(actual_stdin) == _EXPECTED_STDIN_NO_IMAGE
 
-    with temporary_config_folder(config_content) as temp_dir:
-        save_path = temp_dir / "Dockerfile"
-        agent_path = temp_dir / "agent.py"
-        agent_path.touch()
 
-        result = runner.invoke(
-            cli,
-            ["dockerfile", str(save_path), "--config", str(temp_dir / "config.json")],
-        )
+def test_prepare_args_and_stdin_with_image(validated_config: Config) -> None:
+    # this basically serves as an end-to-end test for using config and docker helpers
+    config_path = _THIS_DIR / "langgraph.json"
 
-        # Assert command was successful
-        assert result.exit_code == 0, result.output
-
-        # Check that warning is NOT shown
-        assert "Security Recommendation" not in result.output
-        assert "Wolfi Linux" not in result.output
-
-
-def test_build_command_shows_wolfi_warning() -> None:
-    """Test the 'build' command shows warning when image_distro is not wolfi."""
-    runner = CliRunner()
-    config_content = {
-        "python_version": "3.11",
-        "graphs": {"agent": "agent.py:graph"},
-        "dependencies": ["."],
-        # No image_distro specified - should default to debian and show warning
-    }
-
-    with temporary_config_folder(config_content) as temp_dir:
-        agent_path = temp_dir / "agent.py"
-        agent_path.touch()
-
-        # Mock docker command since we don't want to actually build
-        with runner.isolated_filesystem():
-            result = runner.invoke(
-                cli,
-                [
-                    "build",
-                    "--tag",
-                    "test-image",
-                    "--config",
-                    str(temp_dir / "config.json"),
-                ],
-                catch_exceptions=True,
-            )
-
-        # The command will fail because docker isn't available or we're mocking,
-        # but we should still see the warning before it fails
-        assert "Security Recommendation" in result.output
-        assert "Wolfi Linux" in result.output
-        assert "image_distro" in result.output
-        assert "wolfi" in result.output
-
-
-def test_build_generate_proper_build_context():
-    runner = CliRunner()
-    config_content = {
-        "python_version": "3.11",
-        "graphs": {"agent": "agent.py:graph"},
-        "dependencies": [".", "../../..", "../.."],
-        "image_distro": "wolfi",
-    }
-
-    with temporary_config_folder(config_content, levels=3) as temp_dir:
-        agent_path = temp_dir / "agent.py"
-        agent_path.touch()
-
-        # Mock docker command since we don't want to actually build
-        with runner.isolated_filesystem():
-            result = runner.invoke(
-                cli,
-                [
-                    "build",
-                    "--tag",
-                    "test-image",
-                    "--config",
-                    str(temp_dir / "config.json"),
-                ],
-                catch_exceptions=True,
-            )
-
-        build_context_pattern = re.compile(r"--build-context\s+(\w+)=([^\s]+)")
-
-        build_contexts = re.findall(build_context_pattern, result.output)
-        assert len(build_contexts) == 2, (
-            f"Expected 2 build contexts, but found {len(build_contexts)}"
-        )
+    actual_args, actual_stdin = prepare_args_and_stdin(
+        capabilities=DEFAULT_DOCKER_CAPABILITIES,
+        config_path=config_path,
+        config=validated_config,
+        docker_compose=pathlib.Path("custom-docker-compose.yml"),
+        port=_PORT,
+        debugger_port=_DEBUGGER_PORT,
+        debugger_base_url=_DEBUGGER_GRAPH_URL,
+        watch=True,
+        image="my-cool-image",
+    )
 
+    assert actual_args == _EXPECTED_ARGS
+    assert clean_empty_lines(actual_stdin) == _EXPECTED_STDIN_WITH_IMAGE
 
-def test_dockerfile_command_with_api_version() -> None:
-    """Test the 'dockerfile' command with --api-version flag."""
-    runner = CliRunner()
-    config_content = {
-        "python_version": "3.11",
-        "graphs": {"agent": "agent.py:graph"},
-        "dependencies": ["."],
-    }
 
-    with temporary_config_folder(config_content) as temp_dir:
-        save_path = temp_dir / "Dockerfile"
-        agent_path = temp_dir / "agent.py"
-        agent_path.touch()
+def test_version_option(runner: CliRunner) -> None:
+    """Test the --version option of the CLI."""
+    result = runner.invoke(cli, ["--version"])
 
-        result = runner.invoke(
+    # Verify that the command executed successfully
+    assert result.exit_code == 0, "Expected exit code 0 for --version option"
+
+    # Check that the output contains the correct version information
+    assert "LangGraph CLI, version" in result.output, (
+        "Expected version information in output"
+    )
+
+
+def test_dockerfile_command_with_bad_config(
+    runner: CliRunner, bad_config_dir: Path
+) -> None:
+    """Test the 'dockerfile' command with basic configuration."""
+    save_path = bad_config_dir / "Dockerfile"
+
+    # Let click raise the usage error instead of printing it and exiting
+    with pytest.raises(click.UsageError, match="conf.json' does not exist"):
+        runner.invoke(
             cli,
             [
                 "dockerfile",
                 str(save_path),
                 "--config",
-                str(temp_dir / "config.json"),
-                "--api-version",
-                "0.2.74",
+                str(bad_config_dir / "conf.json"),
             ],
+            standalone_mode=False,
+            catch_exceptions=False,
         )
 
-        # Assert command was successful
-        assert result.exit_code == 0, result.output
-        assert "✅ Created: Dockerfile" in result.output
-
-        # Check if Dockerfile was created and contains correct FROM line
-        assert save_path.exists()
-        with open(save_path) as f:
-            dockerfile = f.read()
-            assert "FROM langchain/langgraph-api:0.2.74-py3.11" in dockerfile
-
-
-def test_dockerfile_command_with_api_version_and_base_image() -> None:
-    """Test the 'dockerfile' command with both --api-version and --base-image flags."""
-    runner = CliRunner()
-    config_content = {
-        "python_version": "3.12",
-        "graphs": {"agent": "agent.py:graph"},
-        "dependencies": ["."],
-        "image_distro": "wolfi",
-    }
 
-    with temporary_config_folder(config_content) as temp_dir:
-        save_path = temp_dir / "Dockerfile"
-        agent_path = temp_dir / "agent.py"
-        agent_path.touch()
+# Checks take the CLI result and the path the command wrote to: the Dockerfile
+# for 'dockerfile' cases, the config folder for 'build' cases.
+
+
+def _assert_wolfi_warning(result: Result, path: Path) -> None:
+    assert "Security Recommendation" in result.output
+    assert "Wolfi Linux" in result.output
+    assert "image_distro" in result.output
+    assert "wolfi" in result.output
+
+
+def _assert_no_wolfi_warning(result: Result, path: Path) -> None:
+    assert "Security Recommendation" not in result.output
+    assert "Wolfi Linux" not in result.output
+
+
+def _assert_dockerfile_from(expected: str) -> Callable[[Result, Path], None]:
+    def check(result: Result, save_path: Path) -> None:
+        assert f"FROM {expected}" in save_path.read_text()
+
+    return check
+
+
+def _assert_from_base_image(result: Result, save_path: Path) -> None:
+    assert _FROM_BASE_IMAGE_RE.match(save_path.read_text())
+
+
+def _assert_docker_compose_files(result: Result, save_path: Path) -> None:
+    assert "✅ Created: .dockerignore" in result.output
+    assert "✅ Created: docker-compose.yml" in result.output
+    assert "✅ Created: .env" in result.output or "➖ Skipped: .env" in result.output
+    assert "🎉 Files generated successfully" in result.output
+
+    # Check if .dockerignore, docker-compose.yml, and .env were created
+    temp_dir = save_path.parent
+    assert (temp_dir / ".dockerignore").exists()
+    assert (temp_dir / "docker-compose.yml").exists()
+    assert (temp_dir / ".env").exists() or "➖ Skipped: .env" in result.output
+
+
+@pytest.mark.parametrize(
+    "config_dir, cli_args, check",
+    [
+        # No image_distro specified - defaults to debian and shows the warning
+        pytest.param("basic_config_dir", [], _assert_wolfi_warning, id="basic"),
+        # New style config specifies agent data as a dictionary:
+        # {"graphs": {"agent1": {"path": ..., ...other fields}}}
+        pytest.param("new_style_config_dir", [], None, id="new_style_config"),
+        pytest.param(
+            "base_image_config_dir", [], _assert_from_base_image, id="with_base_image"
+        ),
+        pytest.param(
+            "docker_compose_config_dir",
+            ["--add-docker-compose"],
+            _assert_docker_compose_files,
+            id="with_docker_compose",
+        ),
+        pytest.param(
+            "wolfi_config_dir",
+            [],
+            _assert_no_wolfi_warning,
+            id="no_wolfi_warning_when_wolfi_set",
+        ),
+        pytest.param(
+            "basic_config_dir",
+            ["--api-version", "0.2.74"],
+            _assert_dockerfile_from("langchain/langgraph-api:0.2.74-py3.11"),
+            id="with_api_version",
+        ),
+        pytest.param(
+            "wolfi_py312_config_dir",
+            ["--api-version", "1.0.0", "--base-image", "my-registry/custom-api"],
+            _assert_dockerfile_from("my-registry/custom-api:1.0.0-py3.12-wolfi"),
+            id="with_api_version_and_base_image",
+        ),
+        pytest.param(
+            "nodejs_config_dir",
+            ["--api-version", "0.2.74"],
+            _assert_dockerfile_from("langchain/langgraphjs-api:0.2.74-node20"),
+            id="with_api_version_nodejs",
+        ),
+    ],
+)
+@pytest.mark.usefixtures("mock_docker")
+def test_dockerfile_command(
+    runner: CliRunner,
+    request: pytest.FixtureRequest,
+    config_dir: str,
+    cli_args: list[str],
+    check: Optional[Callable[[Result, Path], None]],
+) -> None:
+    """Test the 'dockerfile' command against the given config folder fixture."""
+    temp_dir: Path = request.getfixturevalue(config_dir)
+    save_path = temp_dir / "Dockerfile"
+    # The config folder may be shared with earlier cases, drop their Dockerfile
+    save_path.unlink(missing_ok=True)
+
+    result = runner.invoke(
+        cli,
+        [
+            "dockerfile",
+            str(save_path),
+            "--config",
+            str(temp_dir / "config.json"),
+            *cli_args,
+        ],
+    )
 
-        result = runner.invoke(
-            cli,
+    # Assert command was successful
+    assert result.exit_code == 0, result.output
+    assert "✅ Created: Dockerfile" in result.output
+
+    # Check if Dockerfile was created
+    assert save_path.exists()
+    if check is not None:
+        check(result, save_path)
+
+
+@pytest.mark.parametrize(
+    "config_dir, cli_args, expected_image, build_contexts, check",
+    [
+        pytest.param(
+            "basic_config_dir",
+            [],
+            "langchain/langgraph-api:3.11",
+            [],
+            _assert_wolfi_warning,
+            id="shows_wolfi_warning",
+        ),
+        pytest.param(
+            "nested_config_dir",
+            [],
+            "langchain/langgraph-api:3.11-wolfi",
+            ["../../..", "../.."],
+            None,
+            id="generate_proper_build_context",
+        ),
+        pytest.param(
+            "wolfi_config_dir",
+            ["--api-version", "0.2.74", "--no-pull"],
+            "langchain/langgraph-api:0.2.74-py3.11-wolfi",
+            [],
+            None,
+            id="with_api_version",
+        ),
+        pytest.param(
+            "wolfi_py312_config_dir",
             [
-                "dockerfile",
-                str(save_path),
-                "--config",
-                str(temp_dir / "config.json"),
                 "--api-version",
                 "1.0.0",
                 "--base-image",
                 "my-registry/custom-api",
+                "--no-pull",
             ],
-        )
-
-        # Assert command was successful
-        assert result.exit_code == 0, result.output
-        assert "✅ Created: Dockerfile" in result.output
-
-        # Check if Dockerfile was created and contains correct FROM line
-        assert save_path.exists()
-        with open(save_path) as f:
-            dockerfile = f.read()
-            assert "FROM my-registry/custom-api:1.0.0-py3.12-wolfi" in dockerfile
-
-
-def test_dockerfile_command_with_api_version_nodejs() -> None:
-    """Test the 'dockerfile' command with --api-version flag for Node.js config."""
-    runner = CliRunner()
-    config_content = {
-        "node_version": "20",
-        "graphs": {"agent": "agent.js:graph"},
-    }
-
-    with temporary_config_folder(config_content) as temp_dir:
-        save_path = temp_dir / "Dockerfile"
-        agent_path = temp_dir / "agent.js"
-        agent_path.touch()
-
+            "my-registry/custom-api:1.0.0-py3.12-wolfi",
+            [],
+            None,
+            id="with_api_version_and_base_image",
+        ),
+    ],
+)
+def test_build_command(
+    runner: CliRunner,
+    request: pytest.FixtureRequest,
+    mock_docker: list[tuple[str, tuple[str, ...], Optional[str]]],
+    config_dir: str,
+    cli_args: list[str],
+    expected_image: str,
+    build_contexts: list[str],
+    check: Optional[Callable[[Result, Path], None]],
+) -> None:
+    """Test the 'build' command against the given config folder fixture."""
+    temp_dir: Path = request.getfixturevalue(config_dir)
+
+    # docker is mocked out (see mock_docker) since we don't want to actually build
+    with runner.isolated_filesystem():
         result = runner.invoke(
             cli,
             [
-                "dockerfile",
-                str(save_path),
+                "build",
+                "--tag",
+                "test-image",
                 "--config",
                 str(temp_dir / "config.json"),
-                "--api-version",
-                "0.2.74",
+                *cli_args,
             ],
+            catch_exceptions=True,
         )
 
-        # Assert command was successful
-        assert result.exit_code == 0, result.output
-        assert "✅ Created: Dockerfile" in result.output
-
-        # Check if Dockerfile was created and contains correct FROM line
-        assert save_path.exists()
-        with open(save_path) as f:
-            dockerfile = f.read()
-            assert "FROM langchain/langgraphjs-api:0.2.74-node20" in dockerfile
-
-
-def test_build_command_with_api_version() -> None:
-    """Test the 'build' command with --api-version flag."""
-    runner = CliRunner()
-    config_content = {
-        "python_version": "3.11",
-        "graphs": {"agent": "agent.py:graph"},
-        "dependencies": ["."],
-        "image_distro": "wolfi",  # Use wolfi to avoid warning messages
-    }
-
-    with temporary_config_folder(config_content) as temp_dir:
-        agent_path = temp_dir / "agent.py"
-        agent_path.touch()
-
-        # Mock docker command since we don't want to actually build
-        with runner.isolated_filesystem():
-            result = runner.invoke(
-                cli,
-                [
-                    "build",
-                    "--tag",
-                    "test-image",
-                    "--config",
-                    str(temp_dir / "config.json"),
-                    "--api-version",
-                    "0.2.74",
-                    "--no-pull",  # Avoid pulling non-existent images
-                ],
-                catch_exceptions=True,
-            )
-
-        # Check that the build command is called with the correct tag
-        # The output should contain the docker build command with the api_version tag
-        assert "langchain/langgraph-api:0.2.74-py3.11-wolfi" in result.output
-
-
-def test_build_command_with_api_version_and_base_image() -> None:
-    """Test the 'build' command with both --api-version and --base-image flags."""
-    runner = CliRunner()
-    config_content = {
-        "python_version": "3.12",
-        "graphs": {"agent": "agent.py:graph"},
-        "dependencies": ["."],
-        "image_distro": "wolfi",  # Use wolfi to avoid warning messages
-    }
-
-    with temporary_config_folder(config_content) as temp_dir:
-        agent_path = temp_dir / "agent.py"
-        agent_path.touch()
-
-        # Mock docker command since we don't want to actually build
-        with runner.isolated_filesystem():
-            result = runner.invoke(
-                cli,
-                [
-                    "build",
-                    "--tag",
-                    "test-image",
-                    "--config",
-                    str(temp_dir / "config.json"),
-                    "--api-version",
-                    "1.0.0",
-                    "--base-image",
-                    "my-registry/custom-api",
-                    "--no-pull",  # Avoid pulling non-existent images
-                ],
-                catch_exceptions=True,
-            )
-
-        # Check that the build command includes the api_version
-        assert "my-registry/custom-api:1.0.0-py3.12-wolfi" in result.output
+    assert result.exit_code == 0, result.output
+
+    # The base image is pulled first unless --no-pull is given
+    *pulls, (cmd, args, stdin) = mock_docker
+    if "--no-pull" in cli_args:
+        assert pulls == []
+    else:
+        assert pulls == [("docker", ("pull", expected_image), None)]
+
+    # Then the image is built from the generated Dockerfile passed on stdin
+    assert cmd == "docker"
+    assert args[:5] == ("build", "-f", "-", "-t", "test-image")
+    assert args[-1] == str(temp_dir)
+    assert stdin is not None
+    assert stdin.splitlines()[0] == f"FROM {expected_image}"
+
+    # Dependencies outside the config folder are added as extra build contexts
+    actual_contexts = [
+        args[i + 1].split("=", 1)[1]
+        for i, arg in enumerate(args)
+        if arg == "--build-context"
+    ]
+    assert sorted(actual_contexts) == sorted(
+        str((temp_dir / dep).resolve()) for dep in build_contexts
+    )
+
+    if check is not None:
+        check(result, temp_dir)
 
 
 def test_prepare_args_and_stdin_with_api_version() -> None: